@@ -6,11 +6,16 @@ PGN Comment Translator - Translates comments in PGN chess files using LibreTrans
 import re
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import argparse
 import sys
 import os
-from typing import List, Tuple, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, TextIO, Tuple, Optional, Union
 from pathlib import Path
+from urllib.parse import urlparse
 
 try:
     from dotenv import load_dotenv
@@ -18,12 +23,165 @@ try:
 except ImportError:
     pass
 
+# orjson is faster for large batched payloads, but optional
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# Comments made only of engine/clock commands like [%eval 0.34] [%clk 0:03:12]
+_SKIP_RE = re.compile(r'^\s*(\[%[^\]]+\]\s*)+$')
+
+# At least two consecutive letters in any alphabet, i.e. something worth translating
+_HAS_LETTERS = re.compile(r'[^\W\d_]{2,}')
+
+# Engine/clock commands and whitespace around a comment are not translated
+_WS = re.compile(r'\s+')
+_LEADING_ORNAMENTS_RE = re.compile(r'^(?:\s|\[%[^\]]*\])*')
+
+# Maximum number of comments sent in a single /translate request
+BATCH_SIZE = 50
+
+# Short comments are joined with a marker the translator leaves alone,
+# translated as a single text and split back afterwards
+PACK_DELIMITER = "\n@@@\n"
+PACK_MAX_CHARS = 4000
+_PACK_SPLIT_RE = re.compile(r'\s*@@@\s*')
+
+# Concurrent requests used when the server cannot translate a batch at once
+DEFAULT_WORKERS = 8
+
+# Statuses that say nothing about batch support (rate limiting, server unavailable)
+_TRANSIENT_STATUSES = {429, 502, 503, 504}
+
+# Games are translated in chunks so requests stay batched while memory stays bounded
+CHUNK_MAX_COMMENTS = 1000
+CHUNK_MAX_CHARS = 1_000_000
+
+# Auto-detected API URL is remembered between runs for a few minutes
+ENDPOINT_CACHE_TTL = 300
+
+def _endpoint_cache_file() -> Path:
+    """Location of the cached API URL, resolved lazily since HOME may be unset"""
+    return Path(os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache') / 'pgn-translator' / 'endpoint'
+
+def _norm(text: str) -> str:
+    """Cache key for a comment: whitespace collapsed, so re-wrapped copies match"""
+    return _WS.sub(" ", text).strip()
+
+def _trailing_ornaments_start(text: str) -> int:
+    """Index where the trailing whitespace and [%...] commands of a comment begin
+    (scanned backwards: a regex search for them is quadratic on long runs)"""
+    end = len(text)
+    while end:
+        if text[end - 1].isspace():
+            end -= 1
+        elif text[end - 1] == ']':
+            # Same command the pattern [%[^]]*] would match: first '[%' after the previous ']'
+            start = text.find('[%', text.rfind(']', 0, end - 1) + 1, end - 1)
+            if start == -1:
+                break
+            end = start
+        else:
+            break
+    return end
+
+def _split_ornaments(text: str) -> Tuple[str, str, str]:
+    """Split a comment into (prefix, core, suffix), where prefix and suffix are the
+    surrounding whitespace and [%...] commands to re-attach after translating"""
+    prefix_end = _LEADING_ORNAMENTS_RE.match(text).end()
+    suffix_start = max(prefix_end, _trailing_ornaments_start(text))
+    return text[:prefix_end], text[prefix_end:suffix_start], text[suffix_start:]
+
+def _iter_games(f: TextIO) -> Iterator[str]:
+    """Yield the games of a PGN file one at a time, keeping their exact text"""
+    lines = []
+    in_movetext = False
+    in_comment = False
+    
+    for line in f:
+        lines.append(line)
+        
+        if not line.strip():
+            # A blank line after the movetext ends the game (unless inside a comment)
+            if in_movetext and not in_comment:
+                yield "".join(lines)
+                lines = []
+                in_movetext = False
+            continue
+        
+        # '%' escape lines are ignored
+        if not in_comment and line.startswith('%'):
+            continue
+        
+        if not in_movetext and line.lstrip().startswith('['):
+            continue
+        
+        in_movetext = True
+        for token in re.findall(r'[{};]', line):
+            if in_comment:
+                if token == '}':
+                    in_comment = False
+            elif token == '{':
+                in_comment = True
+            elif token == ';':
+                # Rest-of-line comment: braces after it do not count
+                break
+    
+    if lines:
+        yield "".join(lines)
+
+def _iter_game_chunks(f: TextIO) -> Iterator[Tuple[str, int]]:
+    """Yield (text, number of games) for groups of consecutive games, bounded
+    by CHUNK_MAX_COMMENTS comments and CHUNK_MAX_CHARS characters"""
+    games = []
+    comment_count = 0
+    char_count = 0
+    
+    for game in _iter_games(f):
+        games.append(game)
+        comment_count += game.count('{')
+        char_count += len(game)
+        
+        if comment_count >= CHUNK_MAX_COMMENTS or char_count >= CHUNK_MAX_CHARS:
+            yield "".join(games), len(games)
+            games = []
+            comment_count = 0
+            char_count = 0
+    
+    if games:
+        yield "".join(games), len(games)
+
 class PGNTranslator:
-    def __init__(self, api_url: str = None, api_key: str = None, timeout: int = None):
+    def __init__(self, api_url: str = None, api_key: str = None, timeout: int = None, cache_file: str = None,
+                 workers: int = DEFAULT_WORKERS):
+        self.workers = max(1, workers)
+        self.session = self._create_session()
+        
         # Try offline first, then web service
-        self.api_url = (api_url or os.getenv('LIBRETRANSLATE_URL', self._get_default_api_url())).rstrip('/')
+        configured_url = api_url or os.getenv('LIBRETRANSLATE_URL')
+        self._endpoint_auto_detected = not configured_url
+        self._endpoint_from_cache = False
         self.api_key = api_key or os.getenv('LIBRETRANSLATE_API_KEY')
         self.timeout = timeout or int(os.getenv('REQUEST_TIMEOUT', '30'))
+        self.batch_supported = True
+        
+        # Translations keyed by (text, source, target), optionally persisted to disk
+        self._cache: Dict[Tuple[str, str, str], str] = {}
+        self.cache_file = cache_file or os.getenv('TRANSLATION_CACHE_FILE')
+        if self.cache_file:
+            self.load_cache()
+        
+        self._use_api_url(configured_url or self._get_default_api_url())
+    
+    def _use_api_url(self, api_url: str):
+        """Point the translator at a LibreTranslate instance"""
+        self.api_url = api_url.rstrip('/')
         self.translate_endpoint = f"{self.api_url}/translate"
         self.is_offline = self._is_offline_mode()
         
@@ -37,23 +195,94 @@ class PGNTranslator:
         if not self.is_offline and not self.api_key:
             self._prompt_for_api_key()
     
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session that keeps connections alive between requests"""
+        session = requests.Session()
+        session.headers["Content-Type"] = "application/json"
+        # Batched responses can be large, ask for them compressed
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        
+        # Enough pooled connections for every worker thread
+        pool_size = max(16, self.workers)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            # Retry rate limiting and server errors; fail fast when the server is down or hangs
+            max_retries=Retry(
+                total=5,
+                connect=1,
+                read=0,
+                status=5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                backoff_factor=0.5,
+                allowed_methods=["POST"],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
     def _get_default_api_url(self) -> str:
         """Try offline first, fallback to web service"""
+        cached_url = self._load_cached_endpoint()
+        if cached_url:
+            self._endpoint_from_cache = True
+            return cached_url
+        
         # Try offline first
         offline_url = "http://localhost:5000"
         try:
+            # Plain request: the probe should fail fast instead of retrying
             response = requests.get(f"{offline_url}/languages", timeout=3)
             if response.status_code == 200:
+                self._save_cached_endpoint(offline_url)
                 return offline_url
         except requests.RequestException:
             pass
         
-        # Fallback to web service
+        # Fallback to web service (not cached, so a local server started later is found)
         return "https://libretranslate.com"
     
+    def _load_cached_endpoint(self) -> Optional[str]:
+        """Return the API URL detected by a recent run, if any"""
+        try:
+            with open(_endpoint_cache_file(), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            url, ts = cached["url"], cached["ts"]
+            if isinstance(url, str) and isinstance(ts, (int, float)) and time.time() - ts < ENDPOINT_CACHE_TTL:
+                return url
+        except (OSError, RuntimeError, ValueError, KeyError, TypeError):
+            pass
+        return None
+    
+    def _save_cached_endpoint(self, url: str):
+        """Remember the detected API URL for the next runs"""
+        try:
+            cache_file = _endpoint_cache_file()
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump({"url": url, "ts": time.time()}, f)
+        except (OSError, RuntimeError, KeyError):
+            pass
+    
+    def _invalidate_cached_endpoint(self):
+        """Forget the detected API URL so the next run probes again"""
+        # Explicitly configured URLs never touch the cache, and it is removed only once
+        if not self._endpoint_auto_detected:
+            return
+        self._endpoint_auto_detected = False
+        
+        try:
+            _endpoint_cache_file().unlink()
+        except (OSError, RuntimeError, KeyError):
+            pass
+    
     def _is_offline_mode(self) -> bool:
         """Check if using offline LibreTranslate"""
-        return 'localhost' in self.api_url or '127.0.0.1' in self.api_url
+        host = urlparse(self.api_url).hostname or ""
+        return host in {"localhost", "127.0.0.1", "::1"}
     
     def _prompt_for_api_key(self):
         """Prompt user for API key if not configured"""
@@ -80,24 +309,78 @@ class PGNTranslator:
             print("❌ API key required for LibreTranslate web service. Exiting...")
             sys.exit(1)
     
+    def load_cache(self):
+        """Load previously saved translations from the cache file"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Could not load translation cache: {e}", file=sys.stderr)
+            return
+        
+        # Every entry must be [text, source, target, translation]
+        valid = isinstance(entries, list) and all(
+            isinstance(entry, list) and len(entry) == 4 and all(isinstance(value, str) for value in entry)
+            for entry in entries
+        )
+        if not valid:
+            print("⚠️  Could not load translation cache: unexpected file format", file=sys.stderr)
+            return
+        
+        for text, source_lang, target_lang, translated in entries:
+            self._cache[(text, source_lang, target_lang)] = translated
+        print(f"📦 Loaded {len(entries)} cached translations")
+    
+    def save_cache(self):
+        """Write cached translations to the cache file"""
+        if not self.cache_file:
+            return
+        
+        entries = [[text, source_lang, target_lang, translated]
+                   for (text, source_lang, target_lang), translated in self._cache.items()]
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️  Could not save translation cache: {e}", file=sys.stderr)
+    
     def extract_comments(self, pgn_content: str) -> List[Tuple[str, int, int]]:
         """Extract comments from PGN and their positions"""
         comments = []
-        pattern = r'\{([^}]+)\}'
+        find = pgn_content.find
         
-        for match in re.finditer(pattern, pgn_content):
-            comment_text = match.group(1)
-            start_pos = match.start()
-            end_pos = match.end()
-            comments.append((comment_text, start_pos, end_pos))
+        # PGN comments are enclosed in braces and cannot be nested
+        start_pos = find('{')
+        while start_pos != -1:
+            close_pos = find('}', start_pos + 1)
+            if close_pos == -1:
+                break
+            
+            # Empty comments are left untouched
+            if close_pos > start_pos + 1:
+                comments.append((pgn_content[start_pos + 1:close_pos], start_pos, close_pos + 1))
+            
+            start_pos = find('{', close_pos + 1)
         
         return comments
     
-    def translate_text(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
-        """Translate text using LibreTranslate API"""
+    def translate_text(self, text: Union[str, List[str]], source_lang: str, target_lang: str) -> Union[str, List[str]]:
+        """Translate text (or a list of texts in one request) using LibreTranslate API"""
+        translated = self._request_translation(text, source_lang, target_lang)
+        return text if translated is None else translated
+    
+    def _request_translation(self, q: Union[str, List[str]], source_lang: str, target_lang: str) -> Optional[Union[str, List[str]]]:
+        """Send a translation request, returning None on failure"""
+        return self._send_translation(q, source_lang, target_lang)[1]
+    
+    def _send_translation(self, q: Union[str, List[str]], source_lang: str, target_lang: str) -> Tuple[Optional[int], Optional[Union[str, List[str]]]]:
+        """Send a translation request, returning the HTTP status (None if the
+        server could not be reached) and the translation (None on failure)"""
         try:
             payload = {
-                "q": text,
+                "q": q,
                 "source": source_lang,
                 "target": target_lang
             }
@@ -107,61 +390,198 @@ class PGNTranslator:
             elif not self.is_offline:
                 print("⚠️  Warning: No API key provided for web service", file=sys.stderr)
             
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 self.translate_endpoint,
-                headers=headers,
-                data=json.dumps(payload),
+                data=_dumps(payload),
                 timeout=self.timeout
             )
             
             if response.status_code == 200:
-                result = response.json()
-                return result.get("translatedText", text)
+                result = _loads(response.content)
+                return response.status_code, result.get("translatedText")
             else:
+                if response.status_code >= 500:
+                    self._invalidate_cached_endpoint()
                 print(f"Translation error: {response.status_code} - {response.text}", file=sys.stderr)
-                return text
+                return response.status_code, None
                 
         except requests.RequestException as e:
+            self._invalidate_cached_endpoint()
             print(f"Connection error: {e}", file=sys.stderr)
-            return text
+            return None, None
         except json.JSONDecodeError as e:
             print(f"JSON parsing error: {e}", file=sys.stderr)
-            return text
+            return response.status_code, None
+    
+    def _translate_batched(self, texts: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """Translate texts sending up to BATCH_SIZE of them per request (None marks a failure)"""
+        translations = []
+        
+        for i in range(0, len(texts), BATCH_SIZE):
+            batch = texts[i:i + BATCH_SIZE]
+            if self.batch_supported:
+                status, result = self._send_translation(batch, source_lang, target_lang)
+                
+                if isinstance(result, list) and len(result) == len(batch):
+                    translations.extend(result)
+                    continue
+                
+                if status is None or status in _TRANSIENT_STATUSES:
+                    # Server down or rate limiting: keep batching
+                    translations.extend([None] * len(batch))
+                    continue
+                
+                # The batch was rejected: it is only an array problem if a single text goes through
+                first = self._request_translation(batch[0], source_lang, target_lang)
+                if not isinstance(first, str):
+                    translations.extend([None] * len(batch))
+                    continue
+                
+                print("⚠️  Batch request not supported, translating comments individually", file=sys.stderr)
+                self.batch_supported = False
+                translations.append(first)
+                batch = batch[1:]
+            
+            # Server without array support: translate one by one in parallel
+            result = self._translate_individually(batch, source_lang, target_lang)
+            
+            translations.extend(result)
+        
+        return translations
+    
+    def _translate_packed(self, texts: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """Translate texts joining short ones into packs to send fewer items (None marks a failure)"""
+        packs: List[List[int]] = []
+        pack_chars = 0
+        
+        for index, text in enumerate(texts):
+            # Texts with '@' could merge with the marker and split at the wrong place
+            if '@' in text or len(text) >= PACK_MAX_CHARS:
+                packs.append([index])
+                pack_chars = PACK_MAX_CHARS
+            elif packs and pack_chars + len(PACK_DELIMITER) + len(text) <= PACK_MAX_CHARS:
+                packs[-1].append(index)
+                pack_chars += len(PACK_DELIMITER) + len(text)
+            else:
+                packs.append([index])
+                pack_chars = len(text)
+        
+        joined = [PACK_DELIMITER.join(texts[i] for i in pack) for pack in packs]
+        results = self._translate_batched(joined, source_lang, target_lang)
+        
+        translations: List[Optional[str]] = [None] * len(texts)
+        unsplit = []
+        
+        for pack, result in zip(packs, results):
+            if result is None:
+                continue
+            if len(pack) == 1:
+                translations[pack[0]] = result
+                continue
+            
+            pieces = _PACK_SPLIT_RE.split(result.strip())
+            if len(pieces) == len(pack):
+                for index, piece in zip(pack, pieces):
+                    translations[index] = piece
+            else:
+                unsplit.extend(pack)
+        
+        # Packs whose markers got lost are translated again item by item
+        if unsplit:
+            print(f"⚠️  Could not split {len(unsplit)} packed comments, translating them separately", file=sys.stderr)
+            retried = self._translate_batched([texts[i] for i in unsplit], source_lang, target_lang)
+            for index, result in zip(unsplit, retried):
+                translations[index] = result
+        
+        return translations
     
-    def translate_pgn(self, pgn_content: str, source_lang: str, target_lang: str) -> str:
+    def _translate_individually(self, texts: List[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """Translate texts with one concurrent request each (None marks a failure)"""
+        def translate_one(text: str) -> Optional[str]:
+            result = self._request_translation(text, source_lang, target_lang)
+            return result if isinstance(result, str) else None
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(translate_one, texts))
+    
+    def translate_pgn(self, pgn_content: str, source_lang: str, target_lang: str, verbose: bool = True) -> str:
         """Translate all comments in a PGN file"""
         comments = self.extract_comments(pgn_content)
         
         if not comments:
-            print("No comments found to translate")
+            if verbose:
+                print("No comments found to translate")
             return pgn_content
         
-        print(f"Found {len(comments)} comments to translate...")
+        if verbose:
+            print(f"Found {len(comments)} comments to translate...")
+        
+        # Commands and spaces around a comment are kept out of the translation
+        ornaments = {
+            text: _split_ornaments(text)
+            for text in dict.fromkeys(c[0] for c in comments)
+            if not _SKIP_RE.match(text)
+        }
         
-        # Translate from back to front to maintain positions
-        translated_content = pgn_content
+        # Only request unique comments with natural language that are not cached yet,
+        # sending the text as written and caching it under its normalized key
+        pending: Dict[str, str] = {}
+        for _, core, _ in ornaments.values():
+            key = _norm(core)
+            if key not in pending and (key, source_lang, target_lang) not in self._cache and _HAS_LETTERS.search(key):
+                pending[key] = core
         
-        for i, (comment_text, start_pos, end_pos) in enumerate(reversed(comments)):
-            print(f"Translating comment {len(comments) - i}/{len(comments)}: {comment_text[:50]}...")
+        if verbose and len(pending) < len(comments):
+            print(f"Skipping repeated, cached or non-text comments, {len(pending)} left to translate")
+        
+        if pending:
+            translations = self._translate_packed(list(pending.values()), source_lang, target_lang)
+            for key, translated_text in zip(pending, translations):
+                if translated_text is not None:
+                    self._cache[(key, source_lang, target_lang)] = translated_text
+        
+        # Rebuild the PGN from the text between comments and the translated comments
+        # (appending to a list measured faster than a preallocated list or io.StringIO)
+        parts = []
+        cursor = 0
+        
+        for comment_text, start_pos, end_pos in comments:
+            if comment_text not in ornaments:
+                continue
             
-            translated_text = self.translate_text(comment_text, source_lang, target_lang)
+            prefix, core, suffix = ornaments[comment_text]
+            translated_core = self._cache.get((_norm(core), source_lang, target_lang))
+            if not translated_core:
+                continue
             
-            if translated_text and translated_text != comment_text:
+            translated_text = prefix + translated_core + suffix
+            if translated_text != comment_text:
                 # Replace original comment with translation
-                translated_content = (
-                    translated_content[:start_pos] + 
-                    f"{{{translated_text}}}" + 
-                    translated_content[end_pos:]
-                )
+                parts.append(pgn_content[cursor:start_pos])
+                parts.append(f"{{{translated_text}}}")
+                cursor = end_pos
         
-        return translated_content
+        parts.append(pgn_content[cursor:])
+        return "".join(parts)
     
     def test_connection(self) -> bool:
         """Test connection with LibreTranslate API"""
+        if self._check_connection():
+            return True
+        
+        # A URL remembered from a previous run that is now unreachable was
+        # invalidated by the check: detect the endpoint again
+        if self._endpoint_from_cache and not self._endpoint_auto_detected:
+            print("Cached LibreTranslate URL is not responding, detecting again...")
+            self._endpoint_from_cache = False
+            self._endpoint_auto_detected = True
+            self._use_api_url(self._get_default_api_url())
+            return self._check_connection()
+        
+        return False
+    
+    def _check_connection(self) -> bool:
+        """Send a test translation to the current API URL"""
         try:
             test_payload = {
                 "q": "test",
@@ -172,10 +592,9 @@ class PGNTranslator:
             if self.api_key and not self.is_offline:
                 test_payload["api_key"] = self.api_key
             
-            response = requests.post(
+            response = self.session.post(
                 self.translate_endpoint,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(test_payload),
+                json=test_payload,
                 timeout=10
             )
             
@@ -185,10 +604,13 @@ class PGNTranslator:
                 print("❌ API key invalid or required for web service", file=sys.stderr)
                 return False
             else:
+                if response.status_code >= 500:
+                    self._invalidate_cached_endpoint()
                 print(f"❌ Connection test failed: {response.status_code}", file=sys.stderr)
                 return False
             
         except requests.RequestException as e:
+            self._invalidate_cached_endpoint()
             if self.is_offline:
                 print("❌ Cannot connect to offline LibreTranslate. Make sure it's running:", file=sys.stderr)
                 print("   pip install libretranslate", file=sys.stderr)
@@ -215,6 +637,8 @@ def main():
     parser.add_argument("--test-connection", action="store_true", help="Test API connection and exit")
     parser.add_argument("--offline", action="store_true", help="Force offline mode (localhost:5000)")
     parser.add_argument("--web", action="store_true", help="Force web mode (libretranslate.com)")
+    parser.add_argument("--cache", help="JSON file used to persist translations between runs")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help=f"Concurrent requests when batching is unsupported (default: {DEFAULT_WORKERS})")
     
     args = parser.parse_args()
     
@@ -228,7 +652,7 @@ def main():
     elif args.web:
         api_url = "https://libretranslate.com"
     
-    translator = PGNTranslator(api_url, args.api_key)
+    translator = PGNTranslator(api_url, args.api_key, cache_file=args.cache, workers=args.workers)
     
     if args.test_connection:
         if translator.test_connection():
@@ -262,26 +686,22 @@ def main():
     
     print("✓ Connection successful")
     
-    # Read PGN file
-    try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            pgn_content = f.read()
-    except Exception as e:
-        print(f"Error reading file: {e}", file=sys.stderr)
-        sys.exit(1)
-    
-    # Translate
+    # Translate chunks of games, streaming the result to the output file
     print(f"Translating from {args.source} to {args.target}...")
-    translated_content = translator.translate_pgn(pgn_content, args.source, args.target)
-    
-    # Save result
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(translated_content)
+        with open(input_path, 'r', encoding='utf-8') as infile, \
+                open(output_path, 'w', encoding='utf-8') as outfile:
+            games_done = 0
+            for chunk, game_count in _iter_game_chunks(infile):
+                print(f"Translating games {games_done + 1}-{games_done + game_count}...")
+                outfile.write(translator.translate_pgn(chunk, args.source, args.target, verbose=False))
+                games_done += game_count
         print(f"✓ Translation completed. File saved to: {args.output_file}")
     except Exception as e:
-        print(f"Error saving file: {e}", file=sys.stderr)
+        print(f"Error processing file: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        translator.save_cache()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
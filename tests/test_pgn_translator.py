@@ -0,0 +1,285 @@
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pgn_translator
+from pgn_translator import PGNTranslator, _iter_game_chunks, _iter_games, _split_ornaments
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+
+
+def upper_server(q):
+    """Fake LibreTranslate that "translates" by upper-casing"""
+    if isinstance(q, list):
+        return FakeResponse(200, {"translatedText": [text.upper() for text in q]})
+    return FakeResponse(200, {"translatedText": q.upper()})
+
+
+class TranslatorTestCase(unittest.TestCase):
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {"TRANSLATION_CACHE_FILE": ""})
+        env.start()
+        self.addCleanup(env.stop)
+
+        with mock.patch('builtins.print'):
+            self.translator = PGNTranslator("http://localhost:5000")
+
+        self.requests = []
+        self.server = upper_server
+        self.translator.session.post = self._post
+
+    def _post(self, url, data=None, **kwargs):
+        q = json.loads(data)["q"]
+        self.requests.append(q)
+        return self.server(q)
+
+
+class TestPacking(TranslatorTestCase):
+    def test_round_trip(self):
+        texts = ["Good move", "Book move", "White is better"]
+
+        with mock.patch('builtins.print'):
+            result = self.translator._translate_packed(texts, "en", "es")
+
+        self.assertEqual(result, ["GOOD MOVE", "BOOK MOVE", "WHITE IS BETTER"])
+        self.assertEqual(self.requests, [[pgn_translator.PACK_DELIMITER.join(texts)]])
+
+    def test_lost_marker_falls_back_to_single_items(self):
+        def marker_eating_server(q):
+            if any("@@@" in text for text in q):
+                return FakeResponse(200, {"translatedText": [text.replace("@@@", "").upper() for text in q]})
+            return upper_server(q)
+        self.server = marker_eating_server
+
+        with mock.patch('builtins.print'):
+            result = self.translator._translate_packed(["Good move", "Book move"], "en", "es")
+
+        self.assertEqual(result, ["GOOD MOVE", "BOOK MOVE"])
+        self.assertEqual(self.requests[-1], ["Good move", "Book move"])
+
+    def test_texts_with_at_sign_are_not_packed(self):
+        texts = ["Mail me@", "Good move", "Book move"]
+
+        with mock.patch('builtins.print'):
+            result = self.translator._translate_packed(texts, "en", "es")
+
+        self.assertEqual(result, ["MAIL ME@", "GOOD MOVE", "BOOK MOVE"])
+        self.assertEqual(self.requests, [["Mail me@", "Good move" + pgn_translator.PACK_DELIMITER + "Book move"]])
+
+
+class TestBatching(TranslatorTestCase):
+    def test_server_error_keeps_batching(self):
+        self.server = lambda q: FakeResponse(503, {"error": "busy"})
+
+        with mock.patch('builtins.print'):
+            result = self.translator._translate_batched(["a", "b"], "en", "es")
+
+        self.assertEqual(result, [None, None])
+        self.assertTrue(self.translator.batch_supported)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_rejected_array_falls_back_to_single_requests(self):
+        for status in (400, 500):
+            with self.subTest(status=status):
+                def no_array_server(q):
+                    if isinstance(q, list):
+                        return FakeResponse(status, {"error": "Invalid request"})
+                    return upper_server(q)
+                self.server = no_array_server
+                self.translator.batch_supported = True
+
+                with mock.patch('builtins.print'):
+                    result = self.translator._translate_batched(["a", "b"], "en", "es")
+
+                self.assertEqual(result, ["A", "B"])
+                self.assertFalse(self.translator.batch_supported)
+
+    def test_rejected_request_keeps_batching(self):
+        self.server = lambda q: FakeResponse(400, {"error": "Language not supported"})
+
+        with mock.patch('builtins.print'):
+            result = self.translator._translate_batched(["a", "b"], "en", "xx")
+
+        self.assertEqual(result, [None, None])
+        self.assertTrue(self.translator.batch_supported)
+        self.assertEqual(self.requests, [["a", "b"], "a"])
+
+
+class TestExtractComments(TranslatorTestCase):
+    def test_matches_brace_regex(self):
+        pattern = re.compile(r'\{[^}]+\}')
+        rng = random.Random(0)
+
+        for _ in range(2000):
+            text = "".join(rng.choice("{}ab é\n") for _ in range(rng.randint(0, 30)))
+            expected = [(m.group()[1:-1], m.start(), m.end()) for m in pattern.finditer(text)]
+            self.assertEqual(self.translator.extract_comments(text), expected, repr(text))
+
+
+class TestOrnaments(TranslatorTestCase):
+    def test_split_ornaments(self):
+        self.assertEqual(
+            _split_ornaments(" [%eval 0.3] Good  move [%clk 0:01:00] "),
+            (" [%eval 0.3] ", "Good  move", " [%clk 0:01:00] ")
+        )
+        self.assertEqual(_split_ornaments("Good [%eval 1] move"), ("", "Good [%eval 1] move", ""))
+        self.assertEqual(_split_ornaments("[%clk 1:00]"), ("[%clk 1:00]", "", ""))
+
+    def test_split_ornaments_is_linear(self):
+        start = time.perf_counter()
+        _split_ornaments("x" + " " * 40000 + "y")
+        _split_ornaments("[%" * 20000)
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_translate_pgn_reattaches_ornaments(self):
+        pgn = "1. e4 { [%eval 0.3] Good move [%clk 0:01:00] } e5 {Good  move} 2. Nf3 {[%eval 0.3]} Nc6 {!} *\n"
+
+        with mock.patch('builtins.print'):
+            result = self.translator.translate_pgn(pgn, "en", "es")
+
+        self.assertEqual(
+            result,
+            "1. e4 { [%eval 0.3] GOOD MOVE [%clk 0:01:00] } e5 {GOOD MOVE} 2. Nf3 {[%eval 0.3]} Nc6 {!} *\n"
+        )
+        self.assertEqual(self.requests, [["Good move"]])
+
+    def test_translate_pgn_keeps_line_breaks(self):
+        pgn = "1. e4 {A long comment\nwrapped over two lines [%clk 0:01:00]} *\n"
+
+        with mock.patch('builtins.print'):
+            result = self.translator.translate_pgn(pgn, "en", "es")
+
+        self.assertEqual(result, "1. e4 {A LONG COMMENT\nWRAPPED OVER TWO LINES [%clk 0:01:00]} *\n")
+
+
+class TestGames(unittest.TestCase):
+    PGN = (
+        '[Event "A"]\n\n1. e4 {Good} e5 1-0\n\n'
+        '[Event "B"]\n\n1. d4 {Long\n\ncomment} d5\n2. c4 *\n\n'
+        '1. c4 c5 *\n'
+    )
+
+    def test_iter_games_keeps_text_and_comments(self):
+        games = list(_iter_games(io.StringIO(self.PGN)))
+
+        self.assertEqual("".join(games), self.PGN)
+        self.assertEqual(len(games), 3)
+        self.assertIn("{Long\n\ncomment}", games[1])
+
+    def test_iter_games_ignores_braces_in_line_comments_and_escapes(self):
+        pgn = (
+            '1. e4 ; a {tricky\n2. Nf3 *\n\n'
+            '% escaped {line\n1. d4 {ok; still comment}\n\n'
+            '1. c4 *\n'
+        )
+
+        games = list(_iter_games(io.StringIO(pgn)))
+
+        self.assertEqual("".join(games), pgn)
+        self.assertEqual(len(games), 3)
+
+    def test_iter_game_chunks_respects_comment_limit(self):
+        with mock.patch.object(pgn_translator, 'CHUNK_MAX_COMMENTS', 2):
+            chunks = list(_iter_game_chunks(io.StringIO(self.PGN)))
+
+        self.assertEqual([count for _, count in chunks], [2, 1])
+        self.assertEqual("".join(text for text, _ in chunks), self.PGN)
+
+
+class TestEndpointCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_file = Path(tmp.name) / 'pgn-translator' / 'endpoint'
+
+        env = mock.patch.dict(os.environ, {
+            "XDG_CACHE_HOME": tmp.name,
+            "LIBRETRANSLATE_URL": "",
+            "TRANSLATION_CACHE_FILE": "",
+        })
+        env.start()
+        self.addCleanup(env.stop)
+
+        self.local_server_up = False
+        probe = mock.patch.object(pgn_translator.requests, 'get', side_effect=self._probe)
+        self.probe = probe.start()
+        self.addCleanup(probe.stop)
+
+    def _probe(self, url, **kwargs):
+        if self.local_server_up:
+            return FakeResponse(200, [])
+        raise pgn_translator.requests.RequestException("connection refused")
+
+    def _translator(self, **kwargs):
+        with mock.patch('builtins.print'):
+            return PGNTranslator(api_key="key", **kwargs)
+
+    def _write_cache(self, url, ts):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_file.write_text(json.dumps({"url": url, "ts": ts}), encoding='utf-8')
+
+    def test_successful_probe_is_saved_and_reused(self):
+        self.local_server_up = True
+        self.assertEqual(self._translator().api_url, "http://localhost:5000")
+        self.assertTrue(self.cache_file.exists())
+
+        self.probe.reset_mock()
+        self.assertEqual(self._translator().api_url, "http://localhost:5000")
+        self.probe.assert_not_called()
+
+    def test_failed_probe_is_not_cached(self):
+        self.assertEqual(self._translator().api_url, "https://libretranslate.com")
+        self.assertFalse(self.cache_file.exists())
+
+    def test_expired_or_invalid_entries_are_ignored(self):
+        for url, ts in (("http://localhost:5000", time.time() - pgn_translator.ENDPOINT_CACHE_TTL - 1),
+                        (1, time.time()),
+                        ("http://localhost:5000", "now")):
+            with self.subTest(url=url, ts=ts):
+                self._write_cache(url, ts)
+                self.assertEqual(self._translator().api_url, "https://libretranslate.com")
+                self.cache_file.unlink()
+
+    def test_configured_url_never_invalidates(self):
+        self._write_cache("http://localhost:5000", time.time())
+
+        translator = self._translator(api_url="http://127.0.0.1:5000")
+        translator._invalidate_cached_endpoint()
+
+        self.assertTrue(self.cache_file.exists())
+
+    def test_stale_entry_is_detected_again(self):
+        self._write_cache("http://localhost:5000", time.time())
+        translator = self._translator()
+        self.assertEqual(translator.api_url, "http://localhost:5000")
+
+        def post(url, **kwargs):
+            if "localhost" in url:
+                raise pgn_translator.requests.RequestException("connection refused")
+            return FakeResponse(200, {"translatedText": "prueba"})
+        translator.session.post = post
+
+        with mock.patch('builtins.print'):
+            self.assertTrue(translator.test_connection())
+
+        self.assertEqual(translator.api_url, "https://libretranslate.com")
+        self.assertFalse(self.cache_file.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()